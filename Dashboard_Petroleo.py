@@ -2,30 +2,17 @@ import pandas as pd
 import numpy as np
 import streamlit as st
 import plotly.express as px
-import requests
-from io import StringIO
+from dados_brent import atualizar_base
 
 st.set_page_config(layout="wide")
 
-url = 'https://drive.google.com/uc?id=1ilAXCcKolm_2WAVdiC_1ycQTq5zHMwhj'  
-response = requests.get(url)
-response.raise_for_status()  
-
-csv_data = StringIO(response.text)
-df = pd.read_csv(csv_data, sep=';', decimal=',')
-df = df.drop(df.columns[2], axis=1)
-df.columns = ['DAT_MEDICAO', 'VLR_PRECO_PETROLEO_BRUTO_DOLAR_BRENT']
-df['DAT_MEDICAO'] = pd.to_datetime(df['DAT_MEDICAO'])
-df = df[df['DAT_MEDICAO'] >= '2020-01-01'].reset_index(drop=True)
-df_tratado = df.copy()
-df_tratado = df_tratado.dropna().reset_index(drop=True)
-df_tratado['DAT_MES_MEDICAO'] = df_tratado['DAT_MEDICAO'].dt.strftime('%Y-%m')
-df_tratado['NUM_DIA_SEMANA'] = df_tratado['DAT_MEDICAO'].dt.dayofweek
-df_tratado['NUM_ANO'] = df_tratado['DAT_MEDICAO'].dt.year
-df_tratado['NME_MES'] = df_tratado['DAT_MEDICAO'].dt.strftime("%b")
+# Compartilhado entre sessões e reexecuções; a base local só é atualizada quando o TTL expira.
+@st.cache_resource(ttl=3600)
+def carregar_dados():
+    return atualizar_base()
+
+df_tratado = carregar_dados()
 df_tratado = df_tratado[(df_tratado['NUM_ANO'] >= 2020) & (df_tratado['NUM_ANO'] <= 2024)]
-df_tratado = df_tratado[['DAT_MEDICAO', 'DAT_MES_MEDICAO', 'NUM_DIA_SEMANA', 'NME_MES', 'NUM_ANO', 'VLR_PRECO_PETROLEO_BRUTO_DOLAR_BRENT']]
-df_tratado = df_tratado[['DAT_MEDICAO','DAT_MES_MEDICAO','NUM_DIA_SEMANA','NME_MES','NUM_ANO','VLR_PRECO_PETROLEO_BRUTO_DOLAR_BRENT']]
 
 min_data = df_tratado['DAT_MEDICAO'].min().date()
 max_data = df_tratado['DAT_MEDICAO'].max().date()
@@ -1,40 +1,280 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-import pickle
-from prophet import Prophet
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+from contextlib import asynccontextmanager
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, Literal, List, Optional
+from datetime import date
 import pandas as pd
-import requests
-import io
+import json
+import os
+import time
+from cache_previsao import CachePrevisao
+from previsao import AMOSTRAS_PADRAO, AMOSTRAS_MAXIMAS, DIAS_MAXIMOS
+from execucao import ExecutorPrevisao, FilaCheia
+from registro_modelos import RegistroModelos
+from formatos_resposta import escolher_formato, resposta_arrow, resposta_ndjson, MIME_ARROW, MIME_NDJSON
+from metricas import Metricas
+from materializacao import LeitorGrades, COLUNAS_PREVISAO
 
-app = FastAPI()
+# Com CARREGAR_MODELO=0 a API não carrega o Prophet e responde só a partir da grade materializada.
+CARREGAR_MODELO = os.environ.get('CARREGAR_MODELO', '1') != '0'
 
-url = 'https://raw.githubusercontent.com/Baaprado/Pos_Tech_FIAP_Fase_4/main/modelo_prophet.pkl'
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    if CARREGAR_MODELO:
+        await executor_previsao.aquecer()
+    yield
+    executor_previsao.encerrar()
 
-try:
-    response = requests.get(url)
-    response.raise_for_status()  
+app = FastAPI(lifespan=ciclo_de_vida)
 
-    if len(response.content) == 0:
-        raise ValueError("O arquivo baixado está vazio.")
+registro = RegistroModelos()
+metricas = Metricas()
+grades = LeitorGrades(registro.diretorio)
+versao_grade = None
 
-    with io.BytesIO(response.content) as f:
-        modelo_prophet = pickle.load(f)
-    print("Modelo carregado com sucesso!")
-except Exception as e:
-    print(f"Erro ao carregar o modelo: {e}")
-    modelo_prophet = None  
+if CARREGAR_MODELO:
+    try:
+        registro.carregar()
+        print(f"Modelo {registro.versao} carregado com sucesso em {registro.tempo_carga:.3f}s!")
+    except Exception as e:
+        print(f"Erro ao carregar o modelo: {e}")
+else:
+    versao_grade = registro.versao_ativa()
+    print(f"Servindo a grade materializada da versão {versao_grade}, sem carregar o modelo.")
+metricas.registrar_modelo(registro.versao or versao_grade, registro.tempo_carga, registro.modelo is not None)
+
+cache_previsao = CachePrevisao()
+executor_previsao = ExecutorPrevisao(registro)
+
+@app.middleware("http")
+async def medir_requisicoes(request: Request, call_next):
+    inicio = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        endpoint = rota(request)
+        metricas.requisicoes.incrementar(endpoint, '500')
+        metricas.erros.incrementar(endpoint)
+        raise
+
+    endpoint = rota(request)
+    metricas.latencia.observar(time.perf_counter() - inicio, endpoint)
+    metricas.requisicoes.incrementar(endpoint, str(response.status_code))
+    if response.status_code >= 400:
+        metricas.erros.incrementar(endpoint)
+    return response
+
+@app.exception_handler(FilaCheia)
+async def fila_cheia(request: Request, exc: FilaCheia):
+    return JSONResponse(status_code=503, content={"error": str(exc)}, headers={'Retry-After': '1'})
+
+def rota(request):
+    # Usa o caminho declarado da rota para não criar um rótulo por URL desconhecida.
+    route = request.scope.get('route')
+    return route.path if route is not None else 'desconhecido'
 
 class PredictRequest(BaseModel):
-    dias: int
+    dias: int = Field(..., ge=0, le=DIAS_MAXIMOS)
+    metodo_intervalo: Literal['completo', 'amostras', 'pontual'] = 'completo'
+    amostras: int = Field(AMOSTRAS_PADRAO, gt=0, le=AMOSTRAS_MAXIMAS)
+
+class IntervaloDatas(BaseModel):
+    inicio: date
+    fim: date
+
+    @model_validator(mode='after')
+    def validar_ordem(self):
+        if self.fim < self.inicio:
+            raise ValueError("'fim' deve ser igual ou posterior a 'inicio'.")
+        return self
+
+class PredictBatchRequest(BaseModel):
+    horizontes: List[Annotated[int, Field(ge=0, le=DIAS_MAXIMOS)]] = []
+    intervalos: List[IntervaloDatas] = []
+    metodo_intervalo: Literal['completo', 'amostras', 'pontual'] = 'completo'
+    amostras: int = Field(AMOSTRAS_PADRAO, gt=0, le=AMOSTRAS_MAXIMAS)
+
+    @model_validator(mode='after')
+    def validar_pedidos(self):
+        if not self.horizontes and not self.intervalos:
+            raise ValueError("Informe ao menos um horizonte ou intervalo.")
+        return self
+
+class ResultadoBatch(BaseModel):
+    dias: Optional[int] = None
+    inicio: Optional[date] = None
+    fim: Optional[date] = None
+    previsoes: List[dict]
+
+class PredictBatchResponse(BaseModel):
+    versao_modelo: str
+    resultados: List[ResultadoBatch]
+
+class RecarregarRequest(BaseModel):
+    versao: Optional[str] = None
+
+def em_uso():
+    if CARREGAR_MODELO:
+        return registro.atual()
+    return None, versao_grade
+
+def previsao_materializada(versao, dias, metodo, tempos):
+    # A grade guarda a previsão com intervalos completos; outros métodos vão ao modelo.
+    inicio = time.perf_counter()
+    grade = grades.abrir(versao)
+    if grade is None or metodo != 'completo' or dias > len(grade):
+        return None
+    tabela = grade.fatia(dias, COLUNAS_PREVISAO)
+    tempos['grade'] = time.perf_counter() - inicio
+    return tabela
+
+def ultima_data_historico(modelo, versao):
+    if modelo is not None:
+        return modelo.history['ds'].max()
+    grade = grades.abrir(versao)
+    if grade is None:
+        raise HTTPException(status_code=503, detail="Versão sem grade materializada e modelo não carregado.")
+    return pd.Timestamp(grade.tabela['ds'][0].as_py()) - pd.Timedelta(days=1)
+
+async def obter_previsao(modelo, versao, dias, metodo, amostras, tempos):
+    if modelo is None:
+        raise HTTPException(status_code=503, detail="Horizonte fora da grade materializada e modelo não carregado.")
+
+    # Previsões com número de amostras escolhido pelo cliente não entram no cache:
+    # cada valor seria uma chave nova, expulsando as entradas de 'completo' e 'pontual'.
+    usar_cache = metodo != 'amostras'
+    amostras = amostras if metodo == 'amostras' else None
+    chave = (versao, metodo)
+
+    if usar_cache:
+        inicio = time.perf_counter()
+        previsao = cache_previsao.buscar(chave, dias)
+        tempos['cache'] = time.perf_counter() - inicio
+        if previsao is not None:
+            return previsao
+
+    inicio = time.perf_counter()
+    previsao, tempos_execucao = await executor_previsao.prever(modelo, versao, dias, metodo, amostras)
+    tempos.update(tempos_execucao)
+    tempos['fila'] = max(time.perf_counter() - inicio - sum(tempos_execucao.values()), 0.0)
+
+    if usar_cache:
+        cache_previsao.guardar(chave, previsao)
+    return previsao
+
+def serializar(previsao, formato, headers):
+    if formato == MIME_ARROW:
+        return resposta_arrow(previsao, headers)
+    if not isinstance(previsao, pd.DataFrame):
+        previsao = previsao.to_pandas()
+    if formato == MIME_NDJSON:
+        return resposta_ndjson(previsao, headers)
+    return JSONResponse(jsonable_encoder(previsao.to_dict(orient='records')), headers=headers)
 
 @app.post("/predict")
-def predict(request: PredictRequest):
-    if modelo_prophet is None:
-        return {"error": "Modelo não carregado. Verifique o arquivo .pkl."}
+async def predict(request: PredictRequest, accept: Optional[str] = Header(None), x_profiling: Optional[str] = Header(None)):
+    modelo, versao = em_uso()
+    if versao is None:
+        metricas.erros.incrementar('/predict')
+        return {"error": "Modelo não carregado. Verifique o registro de modelos."}
 
+    formato = escolher_formato(accept)  # 406 antes de calcular, se nenhum formato servir
     dias = request.dias  
+    tempos = {}
+
+    previsao = previsao_materializada(versao, dias, request.metodo_intervalo, tempos)
+    if previsao is None:
+        previsao = await obter_previsao(modelo, versao, dias, request.metodo_intervalo, request.amostras, tempos)
+
+    inicio = time.perf_counter()
+    resposta = await run_in_threadpool(serializar, previsao, formato, {'X-Versao-Modelo': versao})
+    if formato != MIME_NDJSON:
+        # NDJSON é codificado durante o envio; a serialização não entra nos tempos.
+        tempos['serializacao'] = time.perf_counter() - inicio
+
+    metricas.registrar_etapas(tempos, dias, request.metodo_intervalo)
+    if x_profiling:
+        resposta.headers['X-Tempo-Etapas'] = json.dumps({etapa: round(duracao * 1000, 3) for etapa, duracao in tempos.items()})
+    return resposta
+
+def montar_resultados(previsao, request):
+    resultados = []
+    for dias in request.horizontes:
+        resultados.append(ResultadoBatch(dias=dias, previsoes=previsao.head(dias).to_dict(orient='records')))
+    for intervalo in request.intervalos:
+        fatia = previsao[previsao['ds'].between(pd.Timestamp(intervalo.inicio), pd.Timestamp(intervalo.fim))]
+        resultados.append(ResultadoBatch(inicio=intervalo.inicio, fim=intervalo.fim, previsoes=fatia.to_dict(orient='records')))
+    return resultados
+
+@app.post("/predict/batch", response_model=PredictBatchResponse)
+async def predict_batch(request: PredictBatchRequest):
+    modelo, versao = em_uso()
+    if versao is None:
+        return JSONResponse(status_code=503, content={"error": "Modelo não carregado. Verifique o registro de modelos."})
+
+    # Uma única previsão até a data mais distante pedida; cada item recebe sua fatia.
+    ultima_data = ultima_data_historico(modelo, versao)
+    dias_intervalos = [(pd.Timestamp(intervalo.fim) - ultima_data).days for intervalo in request.intervalos]
+    dias_max = max(request.horizontes + dias_intervalos + [0])
+    if dias_max > DIAS_MAXIMOS:
+        raise HTTPException(status_code=422, detail=f"Intervalo além de {DIAS_MAXIMOS} dias do fim do histórico.")
+
+    tempos = {}
+    previsao = previsao_materializada(versao, dias_max, request.metodo_intervalo, tempos)
+    if previsao is not None:
+        previsao = previsao.to_pandas()
+    else:
+        previsao = await obter_previsao(modelo, versao, dias_max, request.metodo_intervalo, request.amostras, tempos)
+    metricas.registrar_etapas(tempos, dias_max, request.metodo_intervalo)
+
+    resultados = await run_in_threadpool(montar_resultados, previsao, request)
+    return PredictBatchResponse(versao_modelo=versao, resultados=resultados)
+
+@app.get("/cache")
+def estatisticas_cache():
+    return {**cache_previsao.estatisticas(), "execucao": executor_previsao.estatisticas()}
+
+@app.get("/modelo")
+def modelo_ativo():
+    _, versao = em_uso()
+    grade = grades.abrir(versao)
+    return {
+        "versao": versao,
+        "modelo_carregado": registro.modelo is not None,
+        "tempo_carga_segundos": registro.tempo_carga,
+        "dias_materializados": len(grade) if grade is not None else 0,
+        "versoes": registro.versoes(),
+        "metadados": registro.metadados(versao) if versao else {},
+    }
+
+@app.post("/modelo/recarregar")
+def recarregar_modelo(request: RecarregarRequest):
+    global versao_grade
+
+    # A nova versão é carregada antes da troca; requisições em andamento seguem com a anterior.
+    try:
+        if CARREGAR_MODELO:
+            anterior = registro.ativar(request.versao) if request.versao else registro.carregar()
+        else:
+            anterior = versao_grade
+            if request.versao:
+                registro.ativar(request.versao, carregar=False)
+            versao_grade = registro.versao_ativa()
+    except (ValueError, FileNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    _, versao = em_uso()
+    if anterior != versao:
+        cache_previsao.invalidar(anterior)
+        grades.descartar(anterior)
+    metricas.registrar_modelo(versao, registro.tempo_carga, registro.modelo is not None)
+    return modelo_ativo()
 
-    future = modelo_prophet.make_future_dataframe(periods=dias, freq='D')
-    forecast = modelo_prophet.predict(future)
-    
-    return forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(dias).to_dict(orient='records')
\ No newline at end of file
+@app.get("/metrics", response_class=PlainTextResponse)
+def exportar_metricas():
+    metricas.registrar_cache(cache_previsao.estatisticas())
+    metricas.registrar_execucao(executor_previsao.estatisticas())
+    return PlainTextResponse(metricas.exportar(), media_type='text/plain; version=0.0.4')
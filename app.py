@@ -1,10 +1,9 @@
 import streamlit as st
-import pickle
 import pandas as pd
 import matplotlib.pyplot as plt
-from prophet import Prophet
-import requests
-import io
+from previsao import prever, AMOSTRAS_PADRAO
+from materializacao import LeitorGrades
+from registro_modelos import RegistroModelos
 
 st.set_page_config(page_title="Previsão do Preço do Petróleo Brent", layout="wide")
 
@@ -19,19 +18,31 @@ Além disso, é necessário criar um modelo de Machine Learning para previsão d
 realizar o deploy do modelo em produção e criar um MVP utilizando o Streamlit.
 """)
 
-st.header("Carregando o Modelo Prophet")
-url = 'https://raw.githubusercontent.com/Baaprado/Pos_Tech_FIAP_Fase_4/main/modelo_prophet.pkl'
+@st.cache_resource
+def obter_registro():
+    return RegistroModelos()
+
+@st.cache_resource
+def obter_grades(diretorio):
+    return LeitorGrades(diretorio)
 
-try:
-    response = requests.get(url)
-    response.raise_for_status() 
+def carregar_modelo(registro):
+    registro.atualizar()  # carrega a versão ativa, ou troca para a nova se o ponteiro mudou
+    return registro.modelo
 
-    with io.BytesIO(response.content) as f:
-        modelo_prophet = pickle.load(f)
-    st.success("Modelo carregado com sucesso!")
-except Exception as e:
-    st.error(f"Erro ao carregar o modelo: {e}")
-    modelo_prophet = None  
+st.header("Carregando o Modelo Prophet")
+
+# O modelo só é carregado quando a previsão pedida não está na grade materializada.
+registro = obter_registro()
+grades = obter_grades(registro.diretorio)
+versao_modelo = registro.versao_ativa()
+grade = grades.abrir(versao_modelo)
+if grade is not None:
+    st.success(f"Previsões da versão {versao_modelo} materializadas para {len(grade)} dias.")
+elif versao_modelo is None:
+    st.error("Nenhuma versão publicada no registro de modelos.")
+else:
+    st.info(f"Versão {versao_modelo} sem grade materializada; o modelo será carregado na previsão.")
 
 st.header("O que é o Prophet?")
 st.markdown("""
@@ -74,15 +85,50 @@ Aqui estão alguns insights relevantes sobre a variação do preço do petróleo
 
 st.sidebar.header("Configurações de Previsão")
 dias_previsao = st.sidebar.number_input("Número de Dias para Previsão", value=365, min_value=1)
+metodos_intervalo = {
+    "Intervalos completos": "completo",
+    "Intervalos com menos amostras": "amostras",
+    "Somente previsão pontual": "pontual",
+}
+metodo_intervalo = metodos_intervalo[st.sidebar.selectbox("Intervalo de Confiança", list(metodos_intervalo))]
+amostras_intervalo = AMOSTRAS_PADRAO
+if metodo_intervalo == "amostras":
+    amostras_intervalo = st.sidebar.number_input("Número de Amostras", value=AMOSTRAS_PADRAO, min_value=1)
+
+def plotar_previsao(historico, forecast):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    if historico is not None:
+        ax.plot(historico['ds'], historico['y'], 'k.', label="Histórico")
+    ax.plot(forecast['ds'], forecast['yhat'], ls='-', c='#0072B2', label="Previsão")
+    if 'yhat_lower' in forecast:
+        ax.fill_between(forecast['ds'], forecast['yhat_lower'], forecast['yhat_upper'],
+                        color='#0072B2', alpha=0.2, label="Intervalo de confiança")
+    ax.grid(True, which='major', c='gray', ls='-', lw=1, alpha=0.2)
+    ax.legend()
+    return fig
 
 if st.sidebar.button("Prever"):
-    if modelo_prophet is None:
-        st.error("Modelo não carregado. Verifique o arquivo .pkl.")
+    forecast = historico = None
+    if grade is not None and metodo_intervalo == "completo" and dias_previsao <= len(grade):
+        forecast = grade.fatia(dias_previsao).to_pandas()
+        historico_grade = grades.historico(versao_modelo)
+        if historico_grade is not None:
+            historico = historico_grade.tabela.to_pandas()
     else:
-        future = modelo_prophet.make_future_dataframe(periods=dias_previsao, freq='D')
-        forecast = modelo_prophet.predict(future)
-
-        forecast_renamed = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].rename(columns={
+        try:
+            modelo_prophet = carregar_modelo(registro)
+        except Exception as e:
+            st.error(f"Erro ao carregar o modelo: {e}")
+            modelo_prophet = None
+        if modelo_prophet is None:
+            st.error("Modelo não carregado. Verifique o registro de modelos.")
+        else:
+            st.success(f"Modelo {registro.versao} carregado com sucesso em {registro.tempo_carga:.3f}s!")
+            forecast = prever(modelo_prophet, dias_previsao, metodo_intervalo, amostras_intervalo)
+            historico = modelo_prophet.history[['ds', 'y']]
+
+    if forecast is not None:
+        forecast_renamed = forecast.rename(columns={
             'ds': 'Data',
             'yhat': 'Preço Previsto (USD)',
             'yhat_lower': 'Limite Inferior',
@@ -90,11 +136,10 @@ if st.sidebar.button("Prever"):
         })
 
         st.header("Previsão do Preço do Brent")
-        st.write(forecast_renamed.tail(dias_previsao))  # Exibindo as previsões com os novos nomes de coluna
+        st.write(forecast_renamed)  # Exibindo as previsões com os novos nomes de coluna
 
         st.header("Gráfico de Previsão")
-        fig, ax = plt.subplots(figsize=(12, 6))
-        modelo_prophet.plot(forecast, ax=ax)
+        fig = plotar_previsao(historico, forecast)
         plt.xlabel("Data")
         plt.ylabel("Preço do Petróleo (USD)")
         plt.title("Previsão do Preço do Petróleo Brent")
@@ -0,0 +1,158 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from dados_brent import ler_csv, tratar, atualizar_base
+from modelagem import (COLUNA_DATA, COLUNA_PRECO, PARAMETROS_PROPHET, PARAMETROS_SARIMAX,
+                       ajustar_prophet, ajustar_sarimax, prever_prophet, prever_sarimax, serie_prophet)
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.abspath(__file__))
+DIRETORIO_BACKTESTS = os.path.join(DIRETORIO_PROJETO, 'backtests')
+
+# Grade padrão: os modelos ajustados no notebook. Prophet sem amostragem de
+# incerteza, já que o backtest avalia apenas a previsão pontual.
+GRADE_PADRAO = {
+    'prophet': [{**PARAMETROS_PROPHET, 'uncertainty_samples': 0}],
+    'sarimax': [PARAMETROS_SARIMAX],
+}
+
+
+def gerar_cortes(datas, horizonte, n_cortes, passo):
+    # Cortes a cada `passo` observações, do mais recente para trás, deixando
+    # sempre `horizonte` observações depois de cada corte para avaliação.
+    ultimo = len(datas) - horizonte - 1
+    indices = [ultimo - i * passo for i in range(n_cortes)]
+    return sorted(datas[i] for i in indices if i > 0)
+
+
+def chave_fold(modelo, parametros, corte, horizonte, treino):
+    conteudo = json.dumps({
+        'modelo': modelo,
+        'parametros': parametros,
+        'corte': str(corte),
+        'horizonte': horizonte,
+        'treino': hashlib.sha256(pd.util.hash_pandas_object(treino, index=False).values.tobytes()).hexdigest(),
+    }, sort_keys=True, default=list)
+    return hashlib.sha256(conteudo.encode()).hexdigest()[:20]
+
+
+def executar_fold(modelo, parametros, treino, teste):
+    inicio = time.perf_counter()
+    if modelo == 'prophet':
+        ajuste = ajustar_prophet(serie_prophet(treino), **parametros)
+        previsto = prever_prophet(ajuste, teste[COLUNA_DATA])
+    elif modelo == 'sarimax':
+        ajuste = ajustar_sarimax(treino[COLUNA_PRECO], **parametros)
+        previsto = prever_sarimax(ajuste, len(teste))
+    else:
+        raise ValueError(f"Modelo desconhecido: {modelo}")
+
+    return pd.DataFrame({
+        'passo': np.arange(1, len(teste) + 1),
+        'ds': teste[COLUNA_DATA].to_numpy(),
+        'y': teste[COLUNA_PRECO].to_numpy(),
+        'yhat': previsto,
+        'segundos_ajuste': time.perf_counter() - inicio,
+    })
+
+
+def _executar_tarefa(tarefa):
+    resultado = executar_fold(tarefa['modelo'], tarefa['parametros'], tarefa['treino'], tarefa['teste'])
+    temporario = f"{tarefa['arquivo']}.tmp"
+    resultado.to_parquet(temporario, index=False)
+    os.replace(temporario, tarefa['arquivo'])
+    return tarefa['arquivo']
+
+
+def calcular_metricas(folds):
+    erro = folds['y'] - folds['yhat']
+    folds = folds.assign(erro_abs=erro.abs(), erro_quad=erro ** 2, erro_pct=(erro / folds['y']).abs() * 100)
+    metricas = folds.groupby(['modelo', 'parametros', 'passo']).agg(
+        n=('erro_abs', 'size'),
+        mae=('erro_abs', 'mean'),
+        rmse=('erro_quad', 'mean'),
+        mape=('erro_pct', 'mean'),
+    ).reset_index()
+    metricas['rmse'] = np.sqrt(metricas['rmse'])
+    return metricas
+
+
+def executar_backtest(df_tratado, grade=None, horizonte=30, n_cortes=12, passo=21, processos=None,
+                      diretorio=DIRETORIO_BACKTESTS):
+    grade = grade or GRADE_PADRAO
+    df_tratado = df_tratado.sort_values(COLUNA_DATA).reset_index(drop=True)
+    diretorio_cache = os.path.join(diretorio, 'cache')
+    os.makedirs(diretorio_cache, exist_ok=True)
+
+    tarefas, arquivos = [], []
+    for corte in gerar_cortes(df_tratado[COLUNA_DATA].tolist(), horizonte, n_cortes, passo):
+        treino = df_tratado[df_tratado[COLUNA_DATA] <= corte][[COLUNA_DATA, COLUNA_PRECO]]
+        teste = df_tratado[df_tratado[COLUNA_DATA] > corte][[COLUNA_DATA, COLUNA_PRECO]].head(horizonte)
+        for modelo, lista_parametros in grade.items():
+            for parametros in lista_parametros:
+                arquivo = os.path.join(diretorio_cache, f"{chave_fold(modelo, parametros, corte, horizonte, treino)}.parquet")
+                rotulos = {'modelo': modelo, 'parametros': json.dumps(parametros, sort_keys=True), 'corte': corte}
+                arquivos.append((arquivo, rotulos))
+                if not os.path.isfile(arquivo):
+                    tarefas.append({'modelo': modelo, 'parametros': parametros, 'treino': treino,
+                                    'teste': teste, 'arquivo': arquivo})
+
+    print(f"{len(arquivos)} folds, {len(arquivos) - len(tarefas)} já em cache, {len(tarefas)} a ajustar.")
+    if tarefas:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            futuros = [executor.submit(_executar_tarefa, tarefa) for tarefa in tarefas]
+            for i, futuro in enumerate(as_completed(futuros), 1):
+                futuro.result()
+                print(f"  {i}/{len(tarefas)} folds concluídos")
+
+    folds = pd.concat(
+        [pd.read_parquet(arquivo).assign(**rotulos) for arquivo, rotulos in arquivos],
+        ignore_index=True,
+    )
+    return folds, calcular_metricas(folds)
+
+
+def carregar_grade(caminho):
+    with open(caminho) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest com origem móvel dos modelos Prophet e SARIMAX.")
+    parser.add_argument('--csv', default=None, help="CSV do IPEA local (padrão: base de dados_brent).")
+    parser.add_argument('--grade', default=None, help="JSON {modelo: [parametros, ...]} (padrão: modelos do notebook).")
+    parser.add_argument('--horizonte', type=int, default=30, help="Observações previstas por corte.")
+    parser.add_argument('--cortes', type=int, default=12)
+    parser.add_argument('--passo', type=int, default=21, help="Observações entre cortes consecutivos.")
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--inicio', default='2020-01-01')
+    parser.add_argument('--fim', default='2024-12-31')
+    parser.add_argument('--diretorio', default=DIRETORIO_BACKTESTS)
+    args = parser.parse_args()
+
+    if args.csv:
+        with open(args.csv, encoding='utf-8') as f:
+            df_tratado = tratar(ler_csv(f.read()))
+    else:
+        df_tratado = atualizar_base()
+    df_tratado = df_tratado[df_tratado[COLUNA_DATA].between(args.inicio, args.fim)]
+
+    grade = carregar_grade(args.grade) if args.grade else None
+    folds, metricas = executar_backtest(df_tratado, grade, args.horizonte, args.cortes, args.passo,
+                                        args.processos, args.diretorio)
+
+    saida = os.path.join(args.diretorio, 'metricas.csv')
+    metricas.to_csv(saida, index=False)
+    print(f"Métricas por passo gravadas em {saida}")
+    print(folds.assign(erro_abs=(folds['y'] - folds['yhat']).abs())
+          .groupby(['modelo', 'parametros'])['erro_abs'].mean().rename('mae').to_string())
+
+
+if __name__ == '__main__':
+    main()
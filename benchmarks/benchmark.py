@@ -0,0 +1,228 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRETORIO_PROJETO)
+
+from dados_brent import ler_base, ler_csv, salvar_base, tratar
+from previsao import prever
+
+HORIZONTES = [1, 7, 30, 90, 365, 1095, 3650]
+MODELO_PICKLE = os.path.join(DIRETORIO_PROJETO, 'modelo_prophet.pkl')
+
+CODIGO_CARGA_PICKLE = f"""
+import pickle, time
+inicio = time.perf_counter()
+import prophet
+with open({MODELO_PICKLE!r}, 'rb') as f:
+    pickle.load(f)
+print(time.perf_counter() - inicio)
+"""
+
+CODIGO_CARGA_REGISTRO = f"""
+import sys, time
+sys.path.insert(0, {DIRETORIO_PROJETO!r})
+inicio = time.perf_counter()
+from registro_modelos import RegistroModelos
+RegistroModelos().carregar()
+print(time.perf_counter() - inicio)
+"""
+
+
+def resumir(tempos):
+    tempos = sorted(tempos)
+    return {
+        'n': len(tempos),
+        'min': tempos[0],
+        'mediana': statistics.median(tempos),
+        'p95': tempos[min(len(tempos) - 1, int(round(0.95 * (len(tempos) - 1))))],
+        'max': tempos[-1],
+    }
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return resumir(tempos)
+
+
+def gerar_csv_sintetico(inicio='2020-01-01', fim='2024-12-31', semente=42):
+    # Mesmo layout do CSV do IPEA: data;preço com vírgula decimal;coluna extra.
+    datas = pd.bdate_range(inicio, fim)
+    rng = np.random.default_rng(semente)
+    precos = np.clip(70 + np.cumsum(rng.normal(0, 1.2, len(datas))), 10, None)
+    linhas = ['Data;Preço - petróleo bruto - Brent (FOB);']
+    linhas += [f"{data:%Y-%m-%d};{preco:.2f};".replace('.', ',') for data, preco in zip(datas, precos)]
+    return '\n'.join(linhas)
+
+
+def bench_carga_modelo(repeticoes):
+    # Cada medição roda num processo novo, incluindo a importação do Prophet.
+    resultados = {}
+    for nome, codigo in [('pickle', CODIGO_CARGA_PICKLE), ('registro_json', CODIGO_CARGA_REGISTRO)]:
+        tempos = []
+        for _ in range(repeticoes):
+            saida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True)
+            tempos.append(float(saida.stdout.strip().splitlines()[-1]))
+        resultados[nome] = resumir(tempos)
+    return resultados
+
+
+def bench_previsao(modelo, horizontes, repeticoes):
+    resultados = {}
+    for dias in horizontes:
+        resultados[str(dias)] = {
+            'make_future_dataframe': medir(lambda: modelo.make_future_dataframe(periods=dias, freq='D'), repeticoes),
+            'predict_com_historico': medir(
+                lambda: modelo.predict(modelo.make_future_dataframe(periods=dias, freq='D')), repeticoes),
+            'prever_completo': medir(lambda: prever(modelo, dias, 'completo'), repeticoes),
+            'prever_amostras': medir(lambda: prever(modelo, dias, 'amostras'), repeticoes),
+            'prever_pontual': medir(lambda: prever(modelo, dias, 'pontual'), repeticoes),
+        }
+    return resultados
+
+
+def bench_serializacao(modelo, horizontes, repeticoes):
+    from formatos_resposta import pa, resposta_arrow
+
+    resultados = {}
+    for dias in horizontes:
+        previsao = prever(modelo, dias, 'completo')
+        resultados[str(dias)] = {
+            'to_dict_json': medir(lambda: json.dumps(previsao.to_dict(orient='records'), default=str), repeticoes),
+            'ndjson': medir(
+                lambda: previsao.to_json(orient='records', lines=True, date_format='iso', double_precision=15),
+                repeticoes),
+        }
+        if pa is not None:
+            resultados[str(dias)]['arrow_ipc'] = medir(lambda: resposta_arrow(previsao), repeticoes)
+    return resultados
+
+
+def bench_api(horizontes, requisicoes, concorrencia):
+    # A API lê o registro de modelos local; nada aqui acessa a rede.
+    import tempfile
+
+    from fastapi.testclient import TestClient
+
+    import api
+    from cache_previsao import CachePrevisao
+    from materializacao import LeitorGrades
+
+    cache_original, grades_originais = api.cache_previsao, api.grades
+    # Sem grade (diretório vazio), toda previsão passa pelo Prophet, como antes da materialização.
+    sem_grade = LeitorGrades(tempfile.mkdtemp(prefix='sem-grade-'))
+    cenarios = [
+        ('grade', cache_original, grades_originais),
+        ('modelo_com_cache', cache_original, sem_grade),
+        ('modelo_sem_cache', CachePrevisao(max_entradas=0), sem_grade),
+    ]
+    resultados = {}
+    # Um único TestClient mantém todas as requisições no mesmo loop de eventos, como no uvicorn.
+    with TestClient(api.app) as cliente:
+        for cenario, cache, grades in cenarios:
+            api.cache_previsao, api.grades = cache, grades
+            cache.invalidar()
+            corpos = [{'dias': horizontes[i % len(horizontes)]} for i in range(requisicoes)]
+
+            def enviar(corpo):
+                inicio = time.perf_counter()
+                resposta = cliente.post('/predict', json=corpo)
+                resposta.raise_for_status()
+                return time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+                tempos = list(executor.map(enviar, corpos))
+            duracao = time.perf_counter() - inicio
+
+            resultados[cenario] = {
+                'backend': api.executor_previsao.backend,
+                'requisicoes': requisicoes,
+                'concorrencia': concorrencia,
+                'requisicoes_por_segundo': requisicoes / duracao,
+                'latencia': resumir(tempos),
+            }
+    api.cache_previsao, api.grades = cache_original, grades_originais
+    return resultados
+
+
+def bench_dados_dashboard(texto_csv, repeticoes):
+    # CSV tratado do zero (download sem base local) contra a base Parquet que o dashboard lê.
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'brent.parquet')
+        salvar_base(tratar(ler_csv(texto_csv)), caminho)
+        return {
+            'ler_csv': medir(lambda: ler_csv(texto_csv), repeticoes),
+            'tratar': medir(lambda: tratar(ler_csv(texto_csv)), repeticoes),
+            'ler_base_parquet': medir(lambda: ler_base(caminho), repeticoes),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks offline do modelo, da API e do dashboard.")
+    parser.add_argument('--saida', default=None, help="Arquivo JSON de resultados.")
+    parser.add_argument('--csv', default=None, help="Cópia local do CSV do IPEA (padrão: série sintética).")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--horizontes', type=int, nargs='+', default=HORIZONTES)
+    parser.add_argument('--requisicoes', type=int, default=200)
+    parser.add_argument('--concorrencia', type=int, default=8)
+    args = parser.parse_args()
+
+    import pickle
+    with open(MODELO_PICKLE, 'rb') as f:
+        modelo = pickle.load(f)
+
+    if args.csv:
+        with open(args.csv, encoding='utf-8') as f:
+            texto_csv = f.read()
+    else:
+        texto_csv = gerar_csv_sintetico()
+
+    resultados = {
+        'executado_em': datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'pandas': pd.__version__,
+            'prophet': __import__('prophet').__version__,
+        },
+        'parametros': vars(args),
+    }
+    etapas = [
+        ('carga_modelo', lambda: bench_carga_modelo(args.repeticoes)),
+        ('previsao', lambda: bench_previsao(modelo, args.horizontes, args.repeticoes)),
+        ('serializacao', lambda: bench_serializacao(modelo, args.horizontes, args.repeticoes)),
+        ('api', lambda: bench_api(args.horizontes, args.requisicoes, args.concorrencia)),
+        ('dados_dashboard', lambda: bench_dados_dashboard(texto_csv, args.repeticoes)),
+    ]
+    for nome, etapa in etapas:
+        print(f"Executando {nome}...")
+        resultados[nome] = etapa()
+
+    saida = args.saida or os.path.join(
+        DIRETORIO_PROJETO, 'benchmarks', 'resultados', f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(saida), exist_ok=True)
+    with open(saida, 'w') as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {saida}")
+
+
+if __name__ == '__main__':
+    main()
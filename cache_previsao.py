@@ -0,0 +1,69 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Limite de linhas somando todas as previsões guardadas (cada linha é um dia).
+MAX_LINHAS_CACHE = int(os.environ.get('MAX_LINHAS_CACHE', 20000))
+
+
+class CachePrevisao:
+    # Guarda, por versão do modelo, apenas a previsão do maior horizonte já
+    # calculado; horizontes menores são servidos como uma fatia dela. A chave
+    # pode ser a própria versão ou uma tupla que começa por ela. A memória é
+    # limitada pelo total de linhas guardadas, além do número de entradas.
+
+    def __init__(self, max_entradas=8, max_linhas=MAX_LINHAS_CACHE):
+        self.max_entradas = max_entradas
+        self.max_linhas = max_linhas
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def buscar(self, chave_modelo, dias):
+        dias = max(dias, 0)
+        with self._lock:
+            previsao = self._entradas.get(chave_modelo)
+            if previsao is not None and len(previsao) >= dias:
+                self._entradas.move_to_end(chave_modelo)
+                self.acertos += 1
+                return previsao.head(dias)
+            self.falhas += 1
+            return None
+
+    def guardar(self, chave_modelo, previsao):
+        if len(previsao) > self.max_linhas:
+            return
+        with self._lock:
+            atual = self._entradas.get(chave_modelo)
+            if atual is None or len(atual) < len(previsao):
+                self._entradas[chave_modelo] = previsao
+            self._entradas.move_to_end(chave_modelo)
+            while len(self._entradas) > self.max_entradas or self._linhas() > self.max_linhas:
+                self._entradas.popitem(last=False)
+
+    def _linhas(self):
+        return sum(len(previsao) for previsao in self._entradas.values())
+
+    def invalidar(self, versao=None):
+        with self._lock:
+            if versao is None:
+                self._entradas.clear()
+                return
+            for chave in list(self._entradas):
+                if chave == versao or (isinstance(chave, tuple) and chave[0] == versao):
+                    del self._entradas[chave]
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "linhas": self._linhas(),
+                "max_linhas": self.max_linhas,
+                "horizontes": {str(chave): len(previsao) for chave, previsao in self._entradas.items()},
+            }
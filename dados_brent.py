@@ -0,0 +1,73 @@
+import os
+from io import StringIO
+
+import pandas as pd
+import requests
+
+URL_IPEA = 'https://drive.google.com/uc?id=1ilAXCcKolm_2WAVdiC_1ycQTq5zHMwhj'
+DIRETORIO_PROJETO = os.path.dirname(os.path.abspath(__file__))
+DIRETORIO_DADOS = os.environ.get('DIRETORIO_DADOS', os.path.join(DIRETORIO_PROJETO, 'dados'))
+ARQUIVO_BASE = os.path.join(DIRETORIO_DADOS, 'brent.parquet')
+DATA_INICIO = '2020-01-01'
+
+COLUNAS = ['DAT_MEDICAO', 'DAT_MES_MEDICAO', 'NUM_DIA_SEMANA', 'NME_MES', 'NUM_ANO', 'VLR_PRECO_PETROLEO_BRUTO_DOLAR_BRENT']
+
+
+def ler_csv(texto):
+    df = pd.read_csv(StringIO(texto), sep=';', decimal=',')
+    df = df.drop(df.columns[2], axis=1)
+    df.columns = ['DAT_MEDICAO', 'VLR_PRECO_PETROLEO_BRUTO_DOLAR_BRENT']
+    df['DAT_MEDICAO'] = pd.to_datetime(df['DAT_MEDICAO'])
+    return df[df['DAT_MEDICAO'] >= DATA_INICIO].reset_index(drop=True)
+
+
+def baixar_serie(url=URL_IPEA):
+    response = requests.get(url)
+    response.raise_for_status()
+    return ler_csv(response.text)
+
+
+def tratar(df):
+    df_tratado = df.dropna().sort_values('DAT_MEDICAO').reset_index(drop=True)
+    df_tratado['DAT_MES_MEDICAO'] = df_tratado['DAT_MEDICAO'].dt.strftime('%Y-%m')
+    df_tratado['NUM_DIA_SEMANA'] = df_tratado['DAT_MEDICAO'].dt.dayofweek
+    df_tratado['NUM_ANO'] = df_tratado['DAT_MEDICAO'].dt.year
+    df_tratado['NME_MES'] = df_tratado['DAT_MEDICAO'].dt.strftime("%b")
+    return df_tratado[COLUNAS]
+
+
+def ler_base(caminho=ARQUIVO_BASE):
+    if not os.path.isfile(caminho):
+        return None
+    return pd.read_parquet(caminho)
+
+
+def salvar_base(df, caminho=ARQUIVO_BASE):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.tmp"
+    df.to_parquet(temporario, index=False)
+    os.replace(temporario, caminho)
+
+
+def atualizar_base(caminho=ARQUIVO_BASE, url=URL_IPEA):
+    # Acrescenta à base local apenas as linhas posteriores à última data
+    # gravada; as colunas derivadas são calculadas só para essas linhas.
+    base = ler_base(caminho)
+
+    try:
+        serie = baixar_serie(url)
+    except Exception as e:
+        if base is None:
+            raise
+        print(f"Erro ao atualizar a base, usando a cópia local: {e}")
+        return base
+
+    if base is not None and not base.empty:
+        serie = serie[serie['DAT_MEDICAO'] > base['DAT_MEDICAO'].max()]
+        if serie.dropna().empty:
+            return base
+
+    novos = tratar(serie)
+    base = novos if base is None else pd.concat([base, novos], ignore_index=True)
+    salvar_base(base, caminho)
+    return base
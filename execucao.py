@@ -0,0 +1,122 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from previsao import prever
+from registro_modelos import RegistroModelos
+
+BACKEND_PREVISAO = os.environ.get('BACKEND_PREVISAO', 'local')
+PROCESSOS_PREVISAO = int(os.environ.get('PROCESSOS_PREVISAO', os.cpu_count() or 1))
+FILA_MAXIMA_PREVISAO = int(os.environ.get('FILA_MAXIMA_PREVISAO', 4 * PROCESSOS_PREVISAO))
+
+
+class FilaCheia(Exception):
+    pass
+
+
+# Estado de cada processo do pool: o registro e o modelo já carregado.
+_registro_worker = None
+
+
+def _inicializar_worker(diretorio):
+    global _registro_worker
+    _registro_worker = RegistroModelos(diretorio)
+    _registro_worker.carregar()
+
+
+def _aquecer_worker():
+    return os.getpid()
+
+
+def _prever_worker(versao, dias, metodo, amostras):
+    if _registro_worker.versao != versao:
+        _registro_worker.carregar(versao)
+    tempos = {}
+    previsao = prever(_registro_worker.modelo, dias, metodo, amostras, tempos)
+    return previsao, tempos
+
+
+def _prever_local(modelo, dias, metodo, amostras):
+    tempos = {}
+    previsao = prever(modelo, dias, metodo, amostras, tempos)
+    return previsao, tempos
+
+
+class ExecutorPrevisao:
+    # Executa as previsões fora do loop de eventos. No backend 'processos' cada
+    # processo mantém seu próprio modelo carregado; no 'local' usa threads e o
+    # modelo do processo da API. Requisições simultâneas com a mesma chave
+    # compartilham um único cálculo.
+
+    def __init__(self, registro, backend=BACKEND_PREVISAO, processos=PROCESSOS_PREVISAO,
+                 fila_maxima=FILA_MAXIMA_PREVISAO):
+        if backend not in ('local', 'processos'):
+            raise ValueError(f"Backend de previsão inválido: {backend}")
+
+        self.registro = registro
+        self.backend = backend
+        self.processos = processos
+        self.fila_maxima = fila_maxima
+        self._em_andamento = {}
+        self.pendentes = 0
+        self.coalescidas = 0
+        self.rejeitadas = 0
+
+        if backend == 'processos':
+            self._executor = ProcessPoolExecutor(
+                max_workers=processos,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_inicializar_worker,
+                initargs=(registro.diretorio,),
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=processos, thread_name_prefix='previsao')
+
+    async def aquecer(self):
+        # Inicia os processos (e carrega o modelo em cada um) antes da primeira requisição.
+        if self.backend == 'processos':
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*[
+                loop.run_in_executor(self._executor, _aquecer_worker) for _ in range(self.processos)
+            ])
+
+    async def prever(self, modelo, versao, dias, metodo, amostras):
+        chave = (versao, dias, metodo, amostras)
+        futuro = self._em_andamento.get(chave)
+        if futuro is not None:
+            self.coalescidas += 1
+            return await asyncio.shield(futuro)
+
+        if self.pendentes >= self.fila_maxima:
+            self.rejeitadas += 1
+            raise FilaCheia(f"Fila de previsões cheia ({self.fila_maxima} pendentes).")
+
+        loop = asyncio.get_running_loop()
+        if self.backend == 'processos':
+            futuro = loop.run_in_executor(self._executor, _prever_worker, versao, dias, metodo, amostras)
+        else:
+            futuro = loop.run_in_executor(self._executor, _prever_local, modelo, dias, metodo, amostras)
+
+        self.pendentes += 1
+        self._em_andamento[chave] = futuro
+        futuro.add_done_callback(lambda _: self._concluir(chave))
+        # shield: se o cliente desistir, o cálculo segue para quem está aguardando.
+        return await asyncio.shield(futuro)
+
+    def _concluir(self, chave):
+        self.pendentes -= 1
+        self._em_andamento.pop(chave, None)
+
+    def estatisticas(self):
+        return {
+            'backend': self.backend,
+            'processos': self.processos,
+            'fila_maxima': self.fila_maxima,
+            'pendentes': self.pendentes,
+            'coalescidas': self.coalescidas,
+            'rejeitadas': self.rejeitadas,
+        }
+
+    def encerrar(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,83 @@
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+MIME_JSON = 'application/json'
+MIME_NDJSON = 'application/x-ndjson'
+MIME_ARROW = 'application/vnd.apache.arrow.stream'
+
+TAMANHO_BLOCO = 1000
+
+
+FORMATOS = (MIME_JSON, MIME_NDJSON, MIME_ARROW)
+
+
+def _faixas_accept(accept):
+    # [(tipo, qualidade)] de cada faixa de mídia do cabeçalho Accept.
+    faixas = []
+    for parte in accept.split(','):
+        campos = [campo.strip() for campo in parte.split(';')]
+        if not campos[0]:
+            continue
+        qualidade = 1.0
+        for campo in campos[1:]:
+            nome, _, valor = campo.partition('=')
+            if nome.strip().lower() == 'q':
+                try:
+                    qualidade = float(valor)
+                except ValueError:
+                    qualidade = 0.0
+        faixas.append((campos[0].lower(), qualidade))
+    return faixas
+
+
+def escolher_formato(accept):
+    # Negociação pelo cabeçalho Accept (RFC 9110): cada formato recebe a qualidade
+    # da faixa mais específica que o aceita; vence a maior qualidade. Na
+    # ausência do cabeçalho, JSON.
+    if not accept or not accept.strip():
+        return MIME_JSON
+
+    faixas = _faixas_accept(accept)
+    candidatos = []
+    for ordem, formato in enumerate(FORMATOS):
+        grupo = formato.split('/')[0]
+        escolhida = None
+        for posicao, (tipo, qualidade) in enumerate(faixas):
+            especificidade = {formato: 2, f'{grupo}/*': 1, '*/*': 0}.get(tipo)
+            if especificidade is not None and (escolhida is None or especificidade > escolhida[1]):
+                escolhida = (qualidade, especificidade, -posicao)
+        if escolhida is not None and escolhida[0] > 0:
+            candidatos.append((escolhida, -ordem, formato))
+
+    if not candidatos:
+        raise HTTPException(status_code=406, detail=f"Formatos suportados: {', '.join(FORMATOS)}.")
+    return max(candidatos)[2]
+
+
+def resposta_ndjson(previsao, headers=None, tamanho_bloco=TAMANHO_BLOCO):
+    # Cada bloco é codificado de uma vez pelo pandas e enviado assim que pronto.
+    def linhas():
+        for inicio in range(0, len(previsao), tamanho_bloco):
+            bloco = previsao.iloc[inicio:inicio + tamanho_bloco]
+            linhas_bloco = bloco.to_json(orient='records', lines=True, date_format='iso', double_precision=15)
+            yield linhas_bloco.rstrip('\n') + '\n'
+
+    return StreamingResponse(linhas(), media_type=MIME_NDJSON, headers=headers)
+
+
+def resposta_arrow(previsao, headers=None):
+    if pa is None:
+        raise HTTPException(status_code=406, detail="Formato Arrow indisponível: instale o pacote pyarrow.")
+
+    # Tabelas Arrow (fatias da grade materializada) são escritas sem conversão.
+    tabela = previsao if isinstance(previsao, pa.Table) else pa.Table.from_pandas(previsao, preserve_index=False)
+    destino = pa.BufferOutputStream()
+    with pa.ipc.new_stream(destino, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+
+    return Response(content=destino.getvalue().to_pybytes(), media_type=MIME_ARROW, headers=headers)
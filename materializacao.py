@@ -0,0 +1,103 @@
+import argparse
+import os
+import threading
+import time
+
+import pyarrow as pa
+
+from registro_modelos import RegistroModelos
+
+ARQUIVO_GRADE = 'previsoes.arrow'
+ARQUIVO_HISTORICO = 'historico.arrow'
+HORIZONTE_MATERIALIZADO = int(os.environ.get('HORIZONTE_MATERIALIZADO', 3650))
+COLUNAS_PREVISAO = ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
+
+
+def colunas_grade(modelo):
+    componentes = ['trend', 'trend_lower', 'trend_upper']
+    for nome in modelo.seasonalities:
+        componentes += [nome, f"{nome}_lower", f"{nome}_upper"]
+    return COLUNAS_PREVISAO + componentes
+
+
+def _gravar_arrow(df, caminho):
+    # Arquivo Arrow IPC sem compressão, para poder ser mapeado em memória.
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    temporario = f"{caminho}.tmp"
+    with pa.OSFile(temporario, 'wb') as destino:
+        with pa.ipc.new_file(destino, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+    os.replace(temporario, caminho)
+
+
+def materializar(registro, versao=None, dias=HORIZONTE_MATERIALIZADO):
+    versao = versao or registro.versao_ativa()
+    modelo = registro.ler(versao)
+
+    inicio = time.perf_counter()
+    future = modelo.make_future_dataframe(periods=dias, freq='D', include_history=False)
+    forecast = modelo.predict(future)
+    diretorio = os.path.join(registro.diretorio, versao)
+    _gravar_arrow(forecast[colunas_grade(modelo)], os.path.join(diretorio, ARQUIVO_GRADE))
+    _gravar_arrow(modelo.history[['ds', 'y']], os.path.join(diretorio, ARQUIVO_HISTORICO))
+    return time.perf_counter() - inicio
+
+
+class GradePrevisoes:
+    # Previsões materializadas de uma versão, mapeadas em memória. As fatias
+    # são visões sobre o arquivo, sem cópia.
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.tabela = pa.ipc.open_file(pa.memory_map(caminho, 'r')).read_all()
+
+    def __len__(self):
+        return self.tabela.num_rows
+
+    def fatia(self, dias, colunas=COLUNAS_PREVISAO):
+        return self.tabela.select(colunas).slice(0, max(dias, 0))
+
+
+class LeitorGrades:
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        self._grades = {}
+        self._lock = threading.Lock()
+
+    def abrir(self, versao, arquivo=ARQUIVO_GRADE):
+        # Arquivos ausentes não ficam guardados: a grade pode ser materializada depois.
+        if versao is None:
+            return None
+        chave = (versao, arquivo)
+        with self._lock:
+            if chave not in self._grades:
+                caminho = os.path.join(self.diretorio, versao, arquivo)
+                if not os.path.isfile(caminho):
+                    return None
+                self._grades[chave] = GradePrevisoes(caminho)
+            return self._grades[chave]
+
+    def historico(self, versao):
+        return self.abrir(versao, ARQUIVO_HISTORICO)
+
+    def descartar(self, versao):
+        with self._lock:
+            for chave in [chave for chave in self._grades if chave[0] == versao]:
+                del self._grades[chave]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materializa a grade de previsões de uma versão do modelo.")
+    parser.add_argument('--versao', default=None, help="Versão do registro (padrão: a ativa).")
+    parser.add_argument('--dias', type=int, default=HORIZONTE_MATERIALIZADO)
+    args = parser.parse_args()
+
+    registro = RegistroModelos()
+    versao = args.versao or registro.versao_ativa()
+    segundos = materializar(registro, versao, args.dias)
+    print(f"Grade de {args.dias} dias da versão {versao} materializada em {segundos:.2f}s.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+import threading
+from collections import defaultdict
+
+BUCKETS_LATENCIA = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAIXAS_HORIZONTE = ((7, '1-7'), (30, '8-30'), (90, '31-90'), (365, '91-365'), (1095, '366-1095'))
+
+
+def faixa_horizonte(dias):
+    for limite, nome in FAIXAS_HORIZONTE:
+        if dias <= limite:
+            return nome
+    return '1096+'
+
+
+def _formatar_rotulos(nomes, valores, extra=None):
+    pares = list(zip(nomes, valores)) + (extra or [])
+    if not pares:
+        return ''
+    texto = ','.join(f'{nome}="{str(valor).replace(chr(34), chr(39))}"' for nome, valor in pares)
+    return '{' + texto + '}'
+
+
+class Contador:
+
+    def __init__(self, nome, descricao, rotulos=()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = rotulos
+        self._valores = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores, quantidade=1):
+        with self._lock:
+            self._valores[valores] += quantidade
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} counter"]
+        with self._lock:
+            for valores, total in sorted(self._valores.items()):
+                linhas.append(f"{self.nome}{_formatar_rotulos(self.rotulos, valores)} {total}")
+        return linhas
+
+
+class Medidor:
+
+    def __init__(self, nome, descricao, rotulos=()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = rotulos
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def definir(self, valor, *valores):
+        with self._lock:
+            self._valores[valores] = valor
+
+    def limpar(self):
+        with self._lock:
+            self._valores.clear()
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} gauge"]
+        with self._lock:
+            for valores, valor in sorted(self._valores.items()):
+                linhas.append(f"{self.nome}{_formatar_rotulos(self.rotulos, valores)} {valor}")
+        return linhas
+
+
+class Histograma:
+
+    def __init__(self, nome, descricao, rotulos=(), buckets=BUCKETS_LATENCIA):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = rotulos
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *valores):
+        with self._lock:
+            serie = self._series.setdefault(valores, [[0] * len(self.buckets), 0.0, 0])
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[0][i] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            for valores, (contagens, soma, total) in sorted(self._series.items()):
+                for limite, contagem in zip(self.buckets, contagens):
+                    rotulos = _formatar_rotulos(self.rotulos, valores, [('le', limite)])
+                    linhas.append(f"{self.nome}_bucket{rotulos} {contagem}")
+                rotulos = _formatar_rotulos(self.rotulos, valores, [('le', '+Inf')])
+                linhas.append(f"{self.nome}_bucket{rotulos} {total}")
+                linhas.append(f"{self.nome}_sum{_formatar_rotulos(self.rotulos, valores)} {soma}")
+                linhas.append(f"{self.nome}_count{_formatar_rotulos(self.rotulos, valores)} {total}")
+        return linhas
+
+
+class Metricas:
+
+    def __init__(self):
+        self.etapas = Histograma(
+            'previsao_etapa_segundos', "Latência de cada etapa da previsão.",
+            ('etapa', 'faixa_horizonte', 'metodo_intervalo'))
+        self.latencia = Histograma(
+            'http_requisicao_segundos', "Latência total das requisições.", ('endpoint',))
+        self.requisicoes = Contador(
+            'http_requisicoes_total', "Requisições recebidas.", ('endpoint', 'status'))
+        self.erros = Contador(
+            'http_erros_total', "Requisições com erro (exceção ou status >= 400).", ('endpoint',))
+        self.modelo_carregado = Medidor(
+            'modelo_carregado', "1 se há um modelo carregado, 0 caso contrário.")
+        self.modelo_tempo_carga = Medidor(
+            'modelo_tempo_carga_segundos', "Tempo da última carga do modelo.")
+        self.modelo_info = Medidor(
+            'modelo_info', "Versão do modelo ativo (carregado ou servida pela grade materializada).", ('versao',))
+        self.cache = Medidor(
+            'cache_previsao', "Acertos, falhas e entradas do cache de previsões.", ('estatistica',))
+        self.execucao = Medidor(
+            'execucao_previsao', "Pendentes, coalescidas e rejeitadas no executor de previsões.", ('estatistica',))
+
+    def registrar_etapas(self, tempos, dias, metodo_intervalo):
+        faixa = faixa_horizonte(dias)
+        for etapa, duracao in tempos.items():
+            self.etapas.observar(duracao, etapa, faixa, metodo_intervalo)
+
+    def registrar_modelo(self, versao, tempo_carga, carregado=True):
+        self.modelo_carregado.definir(1 if versao and carregado else 0)
+        self.modelo_info.limpar()
+        if versao:
+            self.modelo_info.definir(1, versao)
+        if tempo_carga is not None:
+            self.modelo_tempo_carga.definir(tempo_carga)
+
+    def registrar_cache(self, estatisticas):
+        for estatistica in ('acertos', 'falhas', 'entradas'):
+            self.cache.definir(estatisticas[estatistica], estatistica)
+
+    def registrar_execucao(self, estatisticas):
+        for estatistica in ('pendentes', 'fila_maxima', 'coalescidas', 'rejeitadas', 'processos'):
+            self.execucao.definir(estatisticas[estatistica], estatistica)
+
+    def exportar(self):
+        linhas = []
+        for metrica in (self.etapas, self.latencia, self.requisicoes, self.erros,
+                        self.modelo_carregado, self.modelo_tempo_carga, self.modelo_info, self.cache,
+                        self.execucao):
+            linhas.extend(metrica.exportar())
+        return '\n'.join(linhas) + '\n'
@@ -0,0 +1,63 @@
+import logging
+
+import pandas as pd
+from prophet import Prophet
+from statsmodels.tsa.stattools import adfuller
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+COLUNA_DATA = 'DAT_MEDICAO'
+COLUNA_PRECO = 'VLR_PRECO_PETROLEO_BRUTO_DOLAR_BRENT'
+
+PARAMETROS_PROPHET = {'interval_width': 0.95}
+PARAMETROS_SARIMAX = {'order': (2, 1, 2), 'seasonal_order': (2, 1, 2, 12)}
+
+logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+
+
+def serie_prophet(df_tratado):
+    df_prophet = df_tratado[[COLUNA_DATA, COLUNA_PRECO]].copy()
+    df_prophet.columns = ['ds', 'y']
+    return df_prophet.reset_index(drop=True)
+
+
+def testar_estacionariedade(serie):
+    resultado = adfuller(serie, autolag='AIC')
+    return {
+        'estatistica': resultado[0],
+        'valor_p': resultado[1],
+        'valores_criticos': resultado[4],
+        'estacionaria': resultado[1] <= 0.05,
+    }
+
+
+def parametros_ajustados(modelo):
+    # Parâmetros de um Prophet já ajustado no formato aceito por `init` no fit.
+    return {
+        'k': modelo.params['k'][0][0],
+        'm': modelo.params['m'][0][0],
+        'sigma_obs': modelo.params['sigma_obs'][0][0],
+        'delta': modelo.params['delta'][0],
+        'beta': modelo.params['beta'][0],
+    }
+
+
+def ajustar_prophet(df_prophet, **parametros):
+    parametros = {**PARAMETROS_PROPHET, **parametros}
+    return Prophet(**parametros).fit(df_prophet)
+
+
+def prever_prophet(modelo, datas):
+    forecast = modelo.predict(pd.DataFrame({'ds': pd.to_datetime(datas)}))
+    return forecast['yhat'].to_numpy()
+
+
+def ajustar_sarimax(serie, **parametros):
+    parametros = {**PARAMETROS_SARIMAX, **parametros}
+    modelo = SARIMAX(pd.Series(serie).reset_index(drop=True),
+                     order=tuple(parametros['order']),
+                     seasonal_order=tuple(parametros['seasonal_order']))
+    return modelo.fit(disp=False)
+
+
+def prever_sarimax(ajuste, passos):
+    return ajuste.forecast(steps=passos).to_numpy()
@@ -0,0 +1,37 @@
+import copy
+import time
+import pandas as pd
+
+METODOS_INTERVALO = ('completo', 'amostras', 'pontual')
+AMOSTRAS_PADRAO = 100
+AMOSTRAS_MAXIMAS = 1000  # padrão do Prophet para uncertainty_samples
+DIAS_MAXIMOS = 3 * 3650
+
+
+def prever(modelo, dias, metodo_intervalo='completo', amostras=AMOSTRAS_PADRAO, tempos=None):
+    # Monta e pontua apenas as datas futuras, sem repassar o histórico ao Prophet.
+    # Se `tempos` for um dicionário, recebe a duração de cada etapa em segundos.
+    if metodo_intervalo not in METODOS_INTERVALO:
+        raise ValueError(f"Método de intervalo inválido: {metodo_intervalo}")
+
+    colunas = ['ds', 'yhat'] if metodo_intervalo == 'pontual' else ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
+    if dias <= 0:
+        return pd.DataFrame(columns=colunas)
+
+    if metodo_intervalo != 'completo':
+        # Cópia rasa para não alterar o número de amostras do modelo compartilhado.
+        modelo = copy.copy(modelo)
+        modelo.uncertainty_samples = amostras if metodo_intervalo == 'amostras' else 0
+
+    inicio = time.perf_counter()
+    future = modelo.make_future_dataframe(periods=dias, freq='D', include_history=False)
+    meio = time.perf_counter()
+    forecast = modelo.predict(future)
+    fim = time.perf_counter()
+    previsao = forecast[colunas]
+
+    if tempos is not None:
+        tempos['make_future_dataframe'] = meio - inicio
+        tempos['predict'] = fim - meio
+        tempos['selecao_colunas'] = time.perf_counter() - fim
+    return previsao
@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.abspath(__file__))
+DIRETORIO_MODELOS = os.environ.get('DIRETORIO_MODELOS', os.path.join(DIRETORIO_PROJETO, 'modelos'))
+MODELO_PICKLE = os.path.join(DIRETORIO_PROJETO, 'modelo_prophet.pkl')
+
+ARQUIVO_MODELO = 'modelo.json'
+ARQUIVO_METADADOS = 'metadados.json'
+ARQUIVO_ATIVO = 'ATIVO'
+
+
+class RegistroModelos:
+    # Artefatos versionados em <diretorio>/<versao>/modelo.json (serialização JSON
+    # do Prophet). O arquivo ATIVO aponta para a versão servida.
+
+    def __init__(self, diretorio=DIRETORIO_MODELOS):
+        self.diretorio = diretorio
+        self._lock = threading.RLock()
+        self._atual = (None, None)
+        self.tempo_carga = None
+
+    def atual(self):
+        # Par (modelo, versao) consistente mesmo durante uma troca de versão.
+        return self._atual
+
+    @property
+    def modelo(self):
+        return self._atual[0]
+
+    @property
+    def versao(self):
+        return self._atual[1]
+
+    def versoes(self):
+        if not os.path.isdir(self.diretorio):
+            return []
+        return sorted(
+            nome for nome in os.listdir(self.diretorio)
+            if os.path.isfile(os.path.join(self.diretorio, nome, ARQUIVO_MODELO))
+        )
+
+    def versao_ativa(self):
+        caminho = os.path.join(self.diretorio, ARQUIVO_ATIVO)
+        if os.path.isfile(caminho):
+            with open(caminho) as f:
+                return f.read().strip()
+        versoes = self.versoes()
+        return versoes[-1] if versoes else None
+
+    def metadados(self, versao=None):
+        versao = versao or self.versao
+        caminho = os.path.join(self.diretorio, versao, ARQUIVO_METADADOS)
+        if not os.path.isfile(caminho):
+            return {}
+        with open(caminho) as f:
+            return json.load(f)
+
+    def gravar_metadados(self, versao, metadados):
+        caminho = os.path.join(self.diretorio, versao, ARQUIVO_METADADOS)
+        self._escrever_atomico(caminho, json.dumps(metadados, indent=2, ensure_ascii=False))
+
+    def ler(self, versao):
+        # O Prophet só é importado quando um modelo precisa de fato ser carregado.
+        from prophet.serialize import model_from_json
+
+        with open(os.path.join(self.diretorio, versao, ARQUIVO_MODELO)) as f:
+            return model_from_json(f.read())
+
+    def carregar(self, versao=None):
+        with self._lock:
+            versao = versao or self.versao_ativa()
+            if versao is None:
+                raise FileNotFoundError(f"Nenhum modelo encontrado em {self.diretorio}.")
+
+            inicio = time.perf_counter()
+            modelo = self.ler(versao)
+            self.tempo_carga = time.perf_counter() - inicio
+
+            anterior = self.versao
+            self._atual = (modelo, versao)
+            return anterior
+
+    def atualizar(self):
+        # Recarrega apenas se o ponteiro ATIVO mudou desde a última carga.
+        versao = self.versao_ativa()
+        if versao is not None and versao != self.versao:
+            return self.carregar(versao)
+        return None
+
+    def ativar(self, versao, carregar=True):
+        if versao not in self.versoes():
+            raise ValueError(f"Versão inexistente: {versao}")
+        # RLock: carregar() também adquire o lock.
+        with self._lock:
+            anterior = self.carregar(versao) if carregar else self.versao_ativa()
+            self._escrever_atomico(os.path.join(self.diretorio, ARQUIVO_ATIVO), versao)
+            return anterior
+
+    def proxima_versao(self):
+        versoes = [v for v in self.versoes() if v.startswith('v') and v[1:].isdigit()]
+        numero = int(versoes[-1][1:]) + 1 if versoes else 1
+        return f"v{numero:04d}"
+
+    def publicar(self, modelo, metadados=None, ativar=True):
+        from prophet.serialize import model_to_json
+
+        os.makedirs(self.diretorio, exist_ok=True)
+        versao = self.proxima_versao()
+
+        metadados = dict(metadados or {})
+        metadados.setdefault('criado_em', datetime.now().isoformat(timespec='seconds'))
+        metadados.setdefault('ultima_data_treino', str(modelo.history['ds'].max().date()))
+
+        temporario = tempfile.mkdtemp(dir=self.diretorio, prefix='.tmp-')
+        try:
+            os.chmod(temporario, 0o755)
+            with open(os.path.join(temporario, ARQUIVO_MODELO), 'w') as f:
+                f.write(model_to_json(modelo))
+            with open(os.path.join(temporario, ARQUIVO_METADADOS), 'w') as f:
+                json.dump(metadados, f, indent=2, ensure_ascii=False)
+            os.replace(temporario, os.path.join(self.diretorio, versao))
+        except Exception:
+            shutil.rmtree(temporario, ignore_errors=True)
+            raise
+
+        if ativar:
+            self._escrever_atomico(os.path.join(self.diretorio, ARQUIVO_ATIVO), versao)
+        return versao
+
+    def importar_pickle(self, caminho=MODELO_PICKLE, ativar=True):
+        with open(caminho, 'rb') as f:
+            modelo = pickle.load(f)
+        return self.publicar(modelo, {'origem': os.path.basename(caminho)}, ativar=ativar)
+
+    @staticmethod
+    def _escrever_atomico(caminho, conteudo):
+        # Temporário com nome único: escritas concorrentes não disputam o mesmo arquivo.
+        descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), prefix='.tmp-')
+        try:
+            os.chmod(temporario, 0o644)
+            with os.fdopen(descritor, 'w') as f:
+                f.write(conteudo)
+            os.replace(temporario, caminho)
+        except Exception:
+            os.unlink(temporario)
+            raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registro local de versões do modelo Prophet.")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    importar = subparsers.add_parser('importar', help="Publica um modelo .pkl como nova versão.")
+    importar.add_argument('caminho', nargs='?', default=MODELO_PICKLE)
+    importar.add_argument('--sem-ativar', action='store_true')
+
+    ativar = subparsers.add_parser('ativar', help="Define a versão servida.")
+    ativar.add_argument('versao')
+
+    subparsers.add_parser('listar', help="Lista as versões disponíveis.")
+
+    args = parser.parse_args()
+    registro = RegistroModelos()
+
+    if args.comando == 'importar':
+        print(registro.importar_pickle(args.caminho, ativar=not args.sem_ativar))
+    elif args.comando == 'ativar':
+        registro.ativar(args.versao)
+        print(f"Versão ativa: {args.versao}")
+    else:
+        ativa = registro.versao_ativa()
+        for versao in registro.versoes():
+            print(f"{versao} {'*' if versao == ativa else ''}".strip())
+
+
+if __name__ == '__main__':
+    main()
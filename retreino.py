@@ -0,0 +1,178 @@
+import argparse
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from dados_brent import atualizar_base, ler_csv, tratar
+from prophet import Prophet
+
+from modelagem import COLUNA_DATA, COLUNA_PRECO, parametros_ajustados, prever_prophet, serie_prophet
+from materializacao import materializar
+from registro_modelos import RegistroModelos
+
+HOLDOUT_PADRAO = 30
+TOLERANCIA_PADRAO = 0.10
+
+
+class Cronometro:
+
+    def __init__(self):
+        self.tempos = {}
+
+    @contextmanager
+    def etapa(self, nome):
+        inicio = time.perf_counter()
+        yield
+        self.tempos[nome] = round(time.perf_counter() - inicio, 4)
+
+
+def mae(y, yhat):
+    return float(np.mean(np.abs(np.asarray(y) - np.asarray(yhat))))
+
+
+def prophet_configurado(modelo):
+    # Prophet sem ajuste com a mesma configuração do modelo anterior, para que o
+    # warm start seja compatível. As sazonalidades efetivamente usadas no ajuste
+    # anterior são repetidas explicitamente, em vez de redecididas por 'auto'.
+    if modelo.extra_regressors:
+        raise RuntimeError("Retreino incremental não suporta modelos com regressores extras.")
+
+    novo = Prophet(
+        growth=modelo.growth,
+        changepoints=modelo.changepoints if modelo.specified_changepoints else None,
+        n_changepoints=modelo.n_changepoints,
+        changepoint_range=modelo.changepoint_range,
+        yearly_seasonality=False,
+        weekly_seasonality=False,
+        daily_seasonality=False,
+        holidays=modelo.holidays,
+        seasonality_mode=modelo.seasonality_mode,
+        seasonality_prior_scale=modelo.seasonality_prior_scale,
+        holidays_prior_scale=modelo.holidays_prior_scale,
+        changepoint_prior_scale=modelo.changepoint_prior_scale,
+        mcmc_samples=modelo.mcmc_samples,
+        interval_width=modelo.interval_width,
+        uncertainty_samples=modelo.uncertainty_samples,
+        scaling=modelo.scaling,
+        holidays_mode=modelo.holidays_mode,
+    )
+    for nome, sazonalidade in modelo.seasonalities.items():
+        novo.add_seasonality(nome, sazonalidade['period'], sazonalidade['fourier_order'],
+                             sazonalidade['prior_scale'], sazonalidade['mode'], sazonalidade['condition_name'])
+    if modelo.country_holidays:
+        novo.add_country_holidays(modelo.country_holidays)
+    return novo
+
+
+def ajustar_com_warm_start(modelo_base, dados, init):
+    # O Prophet ignora em silêncio um `init` de formato incompatível. O número de
+    # changepoints é conferido antes do ajuste; o de 'beta' só se conhece depois.
+    novo = prophet_configurado(modelo_base)
+    if len(init['delta']) != novo.n_changepoints:
+        raise RuntimeError("Formato de 'delta' mudou em relação ao modelo anterior; "
+                           "o warm start não se aplica a essa configuração.")
+    modelo = novo.fit(dados, init=init)
+    for parametro in ('delta', 'beta'):
+        if modelo.params[parametro].shape[1] != len(init[parametro]):
+            raise RuntimeError(f"Formato de '{parametro}' mudou em relação ao modelo anterior; "
+                               "o warm start não se aplica a essa configuração.")
+    return modelo
+
+
+def retreinar(df_tratado, registro, holdout=HOLDOUT_PADRAO, tolerancia=TOLERANCIA_PADRAO, ativar=True, forcar=False):
+    cronometro = Cronometro()
+    modelo_anterior, versao_anterior = registro.atual()
+    if modelo_anterior is None:
+        raise RuntimeError("Nenhum modelo ativo no registro para servir de ponto de partida.")
+
+    with cronometro.etapa('ingestao'):
+        historico = modelo_anterior.history[['ds', 'y']]
+        ultima_data = historico['ds'].max()
+        novos = serie_prophet(df_tratado[df_tratado[COLUNA_DATA] > ultima_data].dropna(subset=[COLUNA_PRECO]))
+        dados = pd.concat([historico, novos], ignore_index=True).sort_values('ds').reset_index(drop=True)
+
+    print(f"{len(novos)} linhas novas desde {ultima_data.date()} (versão {versao_anterior}).")
+    if novos.empty and not forcar:
+        return None, {'linhas_novas': 0, 'tempos_segundos': cronometro.tempos}
+
+    init = parametros_ajustados(modelo_anterior)
+    # Valida apenas nas linhas novas: o modelo anterior já viu todo o histórico.
+    holdout = min(holdout, len(novos))
+    treino, validacao = dados.iloc[:len(dados) - holdout], dados.iloc[len(dados) - holdout:]
+
+    relatorio = {
+        'versao_base': versao_anterior,
+        'linhas_novas': len(novos),
+        'linhas_treino': len(dados),
+        'holdout': holdout,
+    }
+    if holdout > 0:
+        with cronometro.etapa('ajuste_validacao'):
+            candidato = ajustar_com_warm_start(modelo_anterior, treino, init)
+
+        with cronometro.etapa('validacao'):
+            mae_candidato = mae(validacao['y'], prever_prophet(candidato, validacao['ds']))
+            mae_anterior = mae(validacao['y'], prever_prophet(modelo_anterior, validacao['ds']))
+
+        relatorio.update({'mae_holdout': mae_candidato, 'mae_holdout_versao_base': mae_anterior})
+        print(f"MAE no holdout: candidato {mae_candidato:.4f}, versão {versao_anterior} {mae_anterior:.4f}.")
+        if mae_candidato > mae_anterior * (1 + tolerancia):
+            relatorio['tempos_segundos'] = dict(cronometro.tempos)
+            print("Modelo candidato reprovado na validação; nada foi publicado.")
+            return None, relatorio
+        init = parametros_ajustados(candidato)
+    else:
+        print("Sem linhas novas para validar; publicando sem comparação com a versão atual.")
+
+    with cronometro.etapa('ajuste_final'):
+        modelo = ajustar_com_warm_start(modelo_anterior, dados, init)
+
+    with cronometro.etapa('publicacao'):
+        versao = registro.publicar(modelo, {'origem': 'retreino.py', **relatorio}, ativar=False)
+
+    # A grade é gravada antes da ativação, para que a API e o app nunca vejam
+    # a nova versão ativa sem previsões materializadas.
+    with cronometro.etapa('materializacao'):
+        materializar(registro, versao)
+
+    # Regrava os metadados com os tempos de todas as etapas, inclusive publicação e materialização.
+    relatorio['tempos_segundos'] = dict(cronometro.tempos)
+    registro.gravar_metadados(versao, {**registro.metadados(versao), **relatorio})
+    if ativar:
+        registro.ativar(versao, carregar=False)
+    return versao, relatorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retreino incremental do modelo Prophet com warm start.")
+    parser.add_argument('--csv', default=None, help="CSV do IPEA local (padrão: base de dados_brent).")
+    parser.add_argument('--holdout', type=int, default=HOLDOUT_PADRAO, help="Últimas observações reservadas para validação.")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO,
+                        help="Piora relativa de MAE aceita em relação à versão atual.")
+    parser.add_argument('--sem-ativar', action='store_true', help="Publica a versão sem torná-la ativa.")
+    parser.add_argument('--forcar', action='store_true', help="Retreina mesmo sem linhas novas.")
+    args = parser.parse_args()
+
+    if args.csv:
+        with open(args.csv, encoding='utf-8') as f:
+            df_tratado = tratar(ler_csv(f.read()))
+    else:
+        df_tratado = atualizar_base()
+
+    registro = RegistroModelos()
+    registro.carregar()
+    versao, relatorio = retreinar(df_tratado, registro, args.holdout, args.tolerancia,
+                                  ativar=not args.sem_ativar, forcar=args.forcar)
+
+    for etapa, segundos in relatorio['tempos_segundos'].items():
+        print(f"  {etapa}: {segundos:.3f}s")
+    if versao is None:
+        sys.exit(0 if relatorio['linhas_novas'] == 0 else 1)
+    print(f"Versão {versao} publicada{'' if args.sem_ativar else ' e ativada'}.")
+
+
+if __name__ == '__main__':
+    main()